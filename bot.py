@@ -1,10 +1,17 @@
 import os
+import errno
 import time
+import asyncio
 import json
 import threading
-import requests
+import atexit
+import aiohttp
 import html
 from dotenv import load_dotenv
+try:
+    import orjson
+except ImportError:  # fall back to stdlib json
+    orjson = None
 from apprise import Apprise
 from telegram import Update
 from telegram.ext import (
@@ -22,13 +29,68 @@ CLIENT_ID = os.getenv("TWITCH_CLIENT_ID")
 CLIENT_SECRET = os.getenv("TWITCH_CLIENT_SECRET")
 BOT_TOKEN = os.getenv("BOT_TOKEN")
 CHECK_INTERVAL = int(os.getenv("CHECK_INTERVAL", "60"))
+SAVE_DEBOUNCE = 0.5  # seconds to coalesce watchlist writes
+NOTIFY_WORKERS = 4  # concurrent Apprise deliveries
+NOTIFY_DRAIN_TIMEOUT = 10  # seconds to let queued notifications go out on shutdown
 
-WATCHLIST_FILE = os.path.join(os.path.dirname(__file__), "watchlists.json")
+# Channels seen offline this many polls in a row are only re-checked every OFFLINE_POLL_TTL seconds
+OFFLINE_BACKOFF_TICKS = 2
+OFFLINE_POLL_TTL = 3 * CHECK_INTERVAL
+
+# Helix accepts at most 100 login/user_id params per request
+TWITCH_BATCH_SIZE = 100
+
+# Mount this directory (not single files) in Docker so atomic renames work
+DATA_DIR = os.getenv("DATA_DIR", os.path.dirname(os.path.abspath(__file__)))
+os.makedirs(DATA_DIR, exist_ok=True)
+
+WATCHLIST_FILE = os.path.join(DATA_DIR, "watchlists.json")
+USER_IDS_FILE = os.path.join(DATA_DIR, "user_ids.json")
+USER_ID_TTL = 7 * 24 * 3600  # re-resolve cached logins after a week
+USER_ID_MISS_TTL = 3600  # retry logins Twitch didn't know about after an hour
 
 # === Globals ===
-live_status = {}  # {twitch_user_id: bool}
-user_ids_cache = {}  # {username: user_id}
+live_uids = set()  # twitch user IDs that were live on the last poll
+offline_streak = {}  # {twitch_user_id: consecutive offline polls}
+last_poll_epoch = {}  # {twitch_user_id: time.monotonic() of its last /streams poll}
+user_ids_cache = {}  # {username: [user_id or None if unknown, epoch_resolved]}
+login_of = {}  # {user_id: set(username)}, inverse of user_ids_cache (renames can leave several)
+_user_ids_dirty = False
 watchlists = {}
+channel_subscribers = {}  # {username: set(chat_id)}, reverse index of watchlists
+apprise_cache = {}  # {chat_id: Apprise}, dropped whenever the chat's URLs change
+_watchlists_dirty = threading.Event()
+_flush_lock = threading.Lock()  # flusher thread and the exit hook share the same temp file
+_flusher_stop = threading.Event()
+_token_cache = {"token": None, "expires_at": 0}  # expires_at is time.monotonic()
+
+# === HTTP Session ===
+# One pooled keep-alive aiohttp session for all Twitch calls, so polls skip the TLS handshake.
+# It has to be created on the bot's event loop, see post_init().
+SESSION = None
+RETRY_TOTAL = 3
+RETRY_BACKOFF = 0.3
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+RATE_LIMIT_MAX_WAIT = 60  # never sleep longer than this for a 429
+HTTP_TIMEOUT = aiohttp.ClientTimeout(total=15, connect=5)
+_monitor_task = None
+_notify_workers = []
+notification_queue = None  # asyncio.Queue of (chat_id, title, body), see post_init()
+urgent_check_queue = None  # asyncio.Queue of (chat_id, channel) added since the last poll
+monitor_wake = None  # asyncio.Event, set to poll before CHECK_INTERVAL is up
+
+# === Messages ===
+WELCOME_TEXT = (
+    "👋 Welcome to the Twitchrise bot for Telegram!\n\n" 
+    "Use /add <channel> to monitor a Twitch channel.\n"
+    "Use /remove <channel> to stop monitoring the channel.\n"
+    "Use /list to see your monitor list.\n"
+    "Use /setapprise <url> to add extra notification targets.\n"
+    "Use /rmapprise <number> to remove already added notification targets.\n"
+    "Use /listapprise to list all added notification targets.\n\n"
+    "You can see the supported URLs for notification targets like Discord, Gotify etc. and their formats here - https://github.com/caronc/apprise#supported-notifications. \n\n"
+    "Please remember that these will work in addition to Telegram, you will always receive updates in this chat irrespective of if you add more targets or not."
+)
 
 # === Conversation states ===
 SET_APPRISE_CONFIRM = 1
@@ -38,137 +100,426 @@ def log(msg):
     print(f"[{time.strftime('%Y-%m-%d %H:%M:%S')}] {msg}", flush=True)
 
 # === File Utilities ===
+def json_loads(raw):
+    if orjson:
+        return orjson.loads(raw)
+    return json.loads(raw)
+
+def json_dumps(data):
+    if orjson:
+        return orjson.dumps(data, option=orjson.OPT_INDENT_2)
+    return json.dumps(data, indent=2).encode("utf-8")
+
+def atomic_write(path, payload):
+    # Write a sibling temp file and swap it in, so a crash never leaves a torn file
+    tmp_path = path + ".tmp"
+    with open(tmp_path, "wb") as f:
+        f.write(payload)
+        f.flush()
+        os.fsync(f.fileno())
+    try:
+        os.replace(tmp_path, path)
+    except OSError as e:
+        if e.errno != errno.EBUSY:
+            raise
+        # path is a single-file bind mount and can't be renamed over, write it in place
+        with open(path, "wb") as f:
+            f.write(payload)
+            f.flush()
+            os.fsync(f.fileno())
+        os.remove(tmp_path)
+
 def load_watchlists():
     if not os.path.exists(WATCHLIST_FILE):
         return {}
-    with open(WATCHLIST_FILE, "r", encoding="utf-8") as f:
-        return json.load(f)
+    with open(WATCHLIST_FILE, "rb") as f:
+        data = json_loads(f.read())
+    # Channels are kept as a lowercased set in memory, a sorted list on disk
+    migrated = False
+    for entry in data.values():
+        channels = entry.get("channels", [])
+        entry["channels"] = {c.lower() for c in channels}
+        if len(entry["channels"]) != len(channels) or any(c != c.lower() for c in channels):
+            migrated = True
+    if migrated:
+        # Write the lowercased/merged channels back once instead of redoing it every load
+        mark_dirty()
+    return data
 
 def save_watchlists(watchlists_data):
-    with open(WATCHLIST_FILE, "w", encoding="utf-8") as f:
-        json.dump(watchlists_data, f, indent=2)
+    serializable = {
+        chat_id: {**entry, "channels": sorted(entry.get("channels", ()))}
+        for chat_id, entry in watchlists_data.items()
+    }
+    atomic_write(WATCHLIST_FILE, json_dumps(serializable))
+
+def mark_dirty():
+    _watchlists_dirty.set()
+
+def flush_watchlists():
+    with _flush_lock:
+        if not _watchlists_dirty.is_set():
+            return
+        _watchlists_dirty.clear()
+        try:
+            save_watchlists(watchlists)
+        except RuntimeError:
+            # A handler changed watchlists mid-copy, retry on the next flush
+            _watchlists_dirty.set()
+        except Exception:
+            # Keep the change pending so a failed write is retried, not lost
+            _watchlists_dirty.set()
+            raise
+
+def watchlist_flusher():
+    while not _flusher_stop.wait(SAVE_DEBOUNCE):
+        try:
+            flush_watchlists()
+        except Exception as e:
+            log(f"[ERROR] Saving watchlists: {e}")
+
+def stop_watchlist_flusher(flusher):
+    # Stop the background flusher first, then write whatever is still pending
+    _flusher_stop.set()
+    flusher.join(timeout=5)
+    try:
+        flush_watchlists()
+    except Exception as e:
+        log(f"[ERROR] Saving watchlists on exit: {e}")
+
+def load_user_ids():
+    if not os.path.exists(USER_IDS_FILE):
+        return {}
+    try:
+        with open(USER_IDS_FILE, "rb") as f:
+            return json_loads(f.read())
+    except (OSError, ValueError) as e:
+        log(f"[ERROR] Could not load user ID cache: {e}")
+        return {}
+
+def save_user_ids(cache):
+    atomic_write(USER_IDS_FILE, json_dumps(cache))
+
+def prune_user_ids():
+    # Keep the cache (and the file) to the current watch set, dropping stale misses too
+    if not _user_ids_dirty:
+        return
+    for login in [l for l in user_ids_cache if l not in channel_subscribers]:
+        uid = user_ids_cache.pop(login)[0]
+        logins = login_of.get(uid)
+        if logins is not None:
+            logins.discard(login)
+            if not logins:
+                del login_of[uid]
+
+def flush_user_ids():
+    global _user_ids_dirty
+    if _user_ids_dirty:
+        save_user_ids(user_ids_cache)
+        _user_ids_dirty = False
+
+def build_channel_subscribers(watchlists_data):
+    index = {}
+    for chat_id, data in watchlists_data.items():
+        for channel in data.get("channels", []):
+            index.setdefault(channel, set()).add(chat_id)
+    return index
+
+def build_login_of(cache):
+    index = {}
+    for login, entry in cache.items():
+        if entry[0]:
+            index.setdefault(entry[0], set()).add(login)
+    return index
 
 watchlists = load_watchlists()
+channel_subscribers = build_channel_subscribers(watchlists)
+user_ids_cache = load_user_ids()
+login_of = build_login_of(user_ids_cache)
 
 # === Twitch API Utilities ===
-def get_app_token():
+def chunked(items, size=TWITCH_BATCH_SIZE):
+    items = list(items)
+    return [items[i:i + size] for i in range(0, len(items), size)]
+
+def rate_limit_wait(resp):
+    # Twitch sends Ratelimit-Reset as an epoch timestamp, other hosts may send Retry-After
+    try:
+        if "Ratelimit-Reset" in resp.headers:
+            wait = int(resp.headers["Ratelimit-Reset"]) - time.time()
+        elif "Retry-After" in resp.headers:
+            wait = int(resp.headers["Retry-After"])
+        else:
+            return None
+    except ValueError:
+        return None
+    return min(max(wait, 0), RATE_LIMIT_MAX_WAIT)
+
+async def twitch_request(method, url, **kwargs):
+    # Retry transient failures with exponential backoff, return the decoded JSON body.
+    # Like urllib3's Retry, POSTs are only retried on connection errors, not on status codes.
+    retry_status = method != "POST"
+    for attempt in range(RETRY_TOTAL + 1):
+        delay = RETRY_BACKOFF * 2 ** attempt
+        try:
+            async with SESSION.request(method, url, **kwargs) as resp:
+                if not retry_status or resp.status not in RETRY_STATUSES or attempt == RETRY_TOTAL:
+                    resp.raise_for_status()
+                    return await resp.json()
+                if resp.status == 429:
+                    # Backing off inside the same rate-limit window would just burn retries
+                    delay = rate_limit_wait(resp) or delay
+        except aiohttp.ClientConnectionError:
+            if attempt == RETRY_TOTAL:
+                raise
+        except asyncio.TimeoutError:
+            if not retry_status or attempt == RETRY_TOTAL:
+                raise
+        await asyncio.sleep(delay)
+
+async def get_app_token():
+    # Reuse the cached token until a minute before it expires
+    if _token_cache["token"] and time.monotonic() < _token_cache["expires_at"] - 60:
+        return _token_cache["token"]
+
     log("Requesting Twitch app token...")
-    resp = requests.post("https://id.twitch.tv/oauth2/token", params={
+    data = await twitch_request("POST", "https://id.twitch.tv/oauth2/token", params={
         "client_id": CLIENT_ID,
         "client_secret": CLIENT_SECRET,
         "grant_type": "client_credentials"
     })
-    resp.raise_for_status()
+    _token_cache["token"] = data["access_token"]
+    _token_cache["expires_at"] = time.monotonic() + data["expires_in"]
     log("Twitch token received.")
-    return resp.json()["access_token"]
+    return _token_cache["token"]
+
+def invalidate_app_token():
+    _token_cache["token"] = None
+    _token_cache["expires_at"] = 0
 
-def get_user_ids(headers, usernames):
-    usernames = [u.lower() for u in usernames]
-    to_fetch = [u for u in usernames if u not in user_ids_cache]
+async def _get_headers():
+    return {
+        "Client-ID": CLIENT_ID,
+        "Authorization": f"Bearer {await get_app_token()}"
+    }
+
+async def get_user_ids(headers, usernames):
+    global _user_ids_dirty
+    if not usernames:
+        return {}
+    # Channels are lowercased on /add and on load, Twitch logins are lowercase too
+    assert all(u == u.lower() for u in usernames)
+    now = time.time()
+
+    def expired(u):
+        entry = user_ids_cache.get(u)
+        if entry is None:
+            return True
+        ttl = USER_ID_TTL if entry[0] else USER_ID_MISS_TTL
+        return now - entry[1] >= ttl
+
+    to_fetch = [u for u in usernames if expired(u)]
     if to_fetch:
         log(f"Fetching Twitch user IDs for: {', '.join(to_fetch)}")
-        resp = requests.get("https://api.twitch.tv/helix/users",
-                            headers=headers,
-                            params=[('login', name) for name in to_fetch])
-        resp.raise_for_status()
-        for user in resp.json()["data"]:
-            user_ids_cache[user['login']] = user['id']
-            log(f"Resolved {user['login']} => {user['id']}")
-    return {u: user_ids_cache.get(u) for u in usernames if u in user_ids_cache}
-
-def get_live_streams(headers, user_ids):
+        chunks = chunked(to_fetch)
+        assert all(len(chunk) <= TWITCH_BATCH_SIZE for chunk in chunks)
+        results = await asyncio.gather(*(
+            twitch_request("GET", "https://api.twitch.tv/helix/users",
+                           headers=headers,
+                           params=[('login', name) for name in chunk])
+            for chunk in chunks
+        ))
+        resolved = {user['login']: user['id'] for result in results for user in result["data"]}
+        # Every fetched login is added, refreshed or turned into a cached miss (unknown/renamed/banned)
+        for u in to_fetch:
+            uid = resolved.get(u)
+            old_id = user_ids_cache.get(u, [None])[0]
+            if old_id and old_id != uid:
+                logins = login_of.get(old_id, set())
+                logins.discard(u)
+                if not logins:
+                    login_of.pop(old_id, None)
+            user_ids_cache[u] = [uid, now]
+            if uid:
+                login_of.setdefault(uid, set()).add(u)
+                log(f"Resolved {u} => {uid}")
+            else:
+                log(f"No Twitch user found for: {u}")
+        _user_ids_dirty = True
+    return {u: user_ids_cache[u][0] for u in usernames if user_ids_cache.get(u, [None])[0]}
+
+async def get_live_streams(headers, user_ids):
     if not user_ids:
         return {}
-    resp = requests.get("https://api.twitch.tv/helix/streams",
-                        headers=headers,
-                        params=[('user_id', uid) for uid in user_ids])
-    resp.raise_for_status()
-    return {stream['user_id']: stream for stream in resp.json()["data"]}
+    chunks = chunked(user_ids)
+    assert all(len(chunk) <= TWITCH_BATCH_SIZE for chunk in chunks)
+    results = await asyncio.gather(*(
+        twitch_request("GET", "https://api.twitch.tv/helix/streams",
+                       headers=headers,
+                       params=[('user_id', uid) for uid in chunk] + [('first', TWITCH_BATCH_SIZE)])
+        for chunk in chunks
+    ))
+    live = {}
+    for result in results:
+        for stream in result["data"]:
+            live[stream['user_id']] = stream
+    return live
 
 # === Notification Utility ===
 def send_notification(chat_id, title, body):
-    ap = Apprise()
-    # Always send to Telegram
-    ap.add(f"tgram://{BOT_TOKEN}/{chat_id}")
-    # Add extra user URLs if available
-    extra_urls = watchlists.get(chat_id, {}).get("apprise_urls", [])
-    for url in extra_urls:
-        ap.add(url)
-    ap.notify(title=title, body=body)
-
-# === Background Twitch Monitor ===
-def monitor_twitch():
-    log("Twitch monitor thread started.")
-    token = get_app_token()
-    headers = {
-        "Client-ID": CLIENT_ID,
-        "Authorization": f"Bearer {token}"
-    }
+    # Hand off to the workers so slow notification targets never delay polling
+    notification_queue.put_nowait((chat_id, title, body))
 
-    global live_status
+async def notification_worker():
     while True:
+        chat_id, title, body = await notification_queue.get()
         try:
-            log("Polling Twitch for stream updates...")
-            # Gather all channels across all users
-            all_channels = set()
-            for data in watchlists.values():
-                all_channels.update(data.get("channels", []))
+            await _do_notify(chat_id, title, body)
+        except Exception as e:
+            log(f"[ERROR] Notification to {chat_id} failed: {e}")
+        finally:
+            notification_queue.task_done()
+
+def get_apprise(chat_id):
+    ap = apprise_cache.get(chat_id)
+    if ap is None:
+        ap = Apprise()
+        # Always send to Telegram
+        ap.add(f"tgram://{BOT_TOKEN}/{chat_id}")
+        # Add extra user URLs if available
+        extra_urls = watchlists.get(chat_id, {}).get("apprise_urls", [])
+        for url in extra_urls:
+            ap.add(url)
+        apprise_cache[chat_id] = ap
+    return ap
+
+async def _do_notify(chat_id, title, body):
+    ap = get_apprise(chat_id)
+    await ap.async_notify(title=title, body=body)
 
-            # Resolve to user IDs
-            user_id_map = get_user_ids(headers, list(all_channels))
+# === Background Twitch Monitor ===
+async def wait_for_next_poll():
+    # CHECK_INTERVAL is an upper bound, /add wakes the monitor early
+    try:
+        await asyncio.wait_for(monitor_wake.wait(), CHECK_INTERVAL)
+    except asyncio.TimeoutError:
+        pass
+    monitor_wake.clear()
 
-            # Poll live streams
-            live_data = get_live_streams(headers, user_id_map.values())
-            current_live = {uid: True for uid in live_data}
+async def monitor_twitch():
+    log("Twitch monitor started.")
 
-            # Check changes per user
-            for chat_id, data in watchlists.items():
-                for username in data.get("channels", []):
-                    uid = user_id_map.get(username.lower())
-                    if not uid:
-                        continue
+    global live_uids
+    while True:
+        if not channel_subscribers:
+            # Nothing to watch, don't spend API calls (or a token request) on it
+            live_uids = set()
+            await wait_for_next_poll()
+            continue
+
+        # Every channel someone is subscribed to
+        all_channels = list(channel_subscribers)
+
+        # Channels added via /add, they get told right away if already live
+        pending = []
+        while not urgent_check_queue.empty():
+            pending.append(urgent_check_queue.get_nowait())
+        # /add, /remove, /add before a poll queues the same pair twice, keep one (in order)
+        pending = list(dict.fromkeys(pending))
+        pending_set = set(pending)
 
-                    was_live = live_status.get(uid, False)
-                    is_live = current_live.get(uid, False)
+        try:
+            log("Polling Twitch for stream updates...")
+            headers = await _get_headers()
 
-                    if is_live and not was_live:
-                        s = live_data[uid]
+            # Resolve to user IDs
+            user_id_map = await get_user_ids(headers, all_channels)
+
+            # Poll live streams, backing off channels that have been offline for a while.
+            # Live channels and fresh /add's are always polled so transitions aren't delayed.
+            now = time.monotonic()
+            urgent_uids = {user_id_map.get(channel) for _, channel in pending}
+            all_uids = set(user_id_map.values())
+            uids_to_poll = [
+                uid for uid in all_uids
+                if uid in live_uids
+                or uid in urgent_uids
+                or offline_streak.get(uid, 0) < OFFLINE_BACKOFF_TICKS
+                or now - last_poll_epoch.get(uid, 0) >= OFFLINE_POLL_TTL
+            ]
+            live_data = await get_live_streams(headers, uids_to_poll)
+            # Skipped channels were offline last poll, so they stay out of live_set
+            live_set = set(live_data)
+
+            for uid in uids_to_poll:
+                last_poll_epoch[uid] = now
+                offline_streak[uid] = 0 if uid in live_set else offline_streak.get(uid, 0) + 1
+            for uid in offline_streak.keys() - all_uids:
+                del offline_streak[uid]
+                last_poll_epoch.pop(uid, None)
+
+            # Only streams that changed state, fanned out to their subscribers
+            for uid in live_set - live_uids:
+                s = live_data[uid]
+                for username in login_of.get(uid, ()):
+                    for chat_id in channel_subscribers.get(username, ()):
+                        if (chat_id, username) in pending_set:
+                            continue  # gets the "already LIVE" message below
                         title = f"🔴 {username} is now LIVE!"
                         body = f"{s['title']}\nGame: {s['game_name']}\nViewers: {s['viewer_count']}\nhttps://twitch.tv/{username}"
                         send_notification(chat_id, title, body)
                         log(f"Notified {chat_id} — {username} went LIVE.")
 
-                    elif not is_live and was_live:
+            for uid in live_uids - live_set:
+                for username in login_of.get(uid, ()):
+                    for chat_id in channel_subscribers.get(username, ()):
                         title = f"⚫ {username} has gone offline."
                         body = f"{username} is no longer streaming.\nhttps://twitch.tv/{username}"
                         send_notification(chat_id, title, body)
                         log(f"Notified {chat_id} — {username} went OFFLINE.")
 
-            live_status = current_live
+            for chat_id, channel in pending:
+                uid = user_id_map.get(channel)
+                if uid not in live_set or chat_id not in channel_subscribers.get(channel, ()):
+                    continue
+                s = live_data[uid]
+                title = f"🟢 {channel} is already LIVE!"
+                body = f"{s['title']}\nGame: {s['game_name']}\nViewers: {s['viewer_count']}\nhttps://twitch.tv/{channel}"
+                send_notification(chat_id, title, body)
+                log(f"Immediate notification to {chat_id} — {channel} already LIVE.")
+
+            live_uids = live_set
+            pending = []
+        except aiohttp.ClientResponseError as e:
+            if e.status == 401:
+                # Token revoked or expired early, fetch a new one next poll
+                invalidate_app_token()
+            log(f"[ERROR] Twitch monitor: {e}")
         except Exception as e:
             log(f"[ERROR] Twitch monitor: {e}")
 
-        time.sleep(CHECK_INTERVAL)
+        # Retry add-time checks from a failed poll on the next one
+        for item in pending:
+            urgent_check_queue.put_nowait(item)
+
+        try:
+            # Prune on the event loop, where watchlists are mutated, then write in a thread
+            prune_user_ids()
+            await asyncio.to_thread(flush_user_ids)
+        except OSError as e:
+            log(f"[ERROR] Saving user ID cache: {e}")
+
+        await wait_for_next_poll()
 
 # === Telegram Bot Commands ===
 async def start(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = str(update.effective_chat.id)
     username = update.effective_user.username or update.effective_user.full_name
     if chat_id not in watchlists:
-        watchlists[chat_id] = {"channels": [], "apprise_urls": []}
-        save_watchlists(watchlists)
+        watchlists[chat_id] = {"channels": set(), "apprise_urls": []}
+        mark_dirty()
     log(f"User {username} ({chat_id}) started the bot.")
-    await update.message.reply_text(
-        "👋 Welcome to the Twitchrise bot for Telegram!\n\n" 
-        "Use /add <channel> to monitor a Twitch channel.\n"
-        "Use /remove <channel> to stop monitoring the channel.\n"
-        "Use /list to see your monitor list.\n"
-        "Use /setapprise <url> to add extra notification targets.\n"
-        "Use /rmapprise <number> to remove already added notification targets.\n"
-        "Use /listapprise to list all added notification targets.\n\n"
-        "You can see the supported URLs for notification targets like Discord, Gotify etc. and their formats here - https://github.com/caronc/apprise#supported-notifications. \n\n"
-        "Please remember that these will work in addition to Telegram, you will always receive updates in this chat irrespective of if you add more targets or not."
-    )
+    await update.message.reply_text(WELCOME_TEXT)
 
 async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = str(update.effective_chat.id)
@@ -178,35 +529,17 @@ async def add_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
 
     channel = context.args[0].lower()
-    watchlists.setdefault(chat_id, {"channels": [], "apprise_urls": []})
+    watchlists.setdefault(chat_id, {"channels": set(), "apprise_urls": []})
 
     if channel not in watchlists[chat_id]["channels"]:
-        watchlists[chat_id]["channels"].append(channel)
-        save_watchlists(watchlists)
+        watchlists[chat_id]["channels"].add(channel)
+        channel_subscribers.setdefault(channel, set()).add(chat_id)
+        mark_dirty()
         log(f"User {username} ({chat_id}) added channel: {channel}")
+        # Let the monitor check whether it is already live on its next poll
+        urgent_check_queue.put_nowait((chat_id, channel))
+        monitor_wake.set()
         await update.message.reply_text(f"✅ Added {channel} to your watchlist.")
-
-        # === Check if channel is live immediately ===
-        try:
-            token = get_app_token()
-            headers = {
-                "Client-ID": CLIENT_ID,
-                "Authorization": f"Bearer {token}"
-            }
-            user_id_map = get_user_ids(headers, [channel])
-            uid = user_id_map.get(channel)
-            if uid:
-                live_data = get_live_streams(headers, [uid])
-                if uid in live_data:
-                    s = live_data[uid]
-                    title = f"🟢 {channel} is already LIVE!"
-                    body = f"{s['title']}\nGame: {s['game_name']}\nViewers: {s['viewer_count']}\nhttps://twitch.tv/{channel}"
-                    send_notification(chat_id, title, body)
-                    log(f"Immediate notification to {username} ({chat_id}) — {channel} already LIVE.")
-                    live_status[uid] = True
-        except Exception as e:
-            log(f"[ERROR] Live check on add failed: {e}")
-
     else:
         await update.message.reply_text(f"⚠️ {channel} is already in your watchlist.")
 
@@ -218,8 +551,13 @@ async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
         return
     channel = context.args[0].lower()
     if chat_id in watchlists and channel in watchlists[chat_id]["channels"]:
-        watchlists[chat_id]["channels"].remove(channel)
-        save_watchlists(watchlists)
+        watchlists[chat_id]["channels"].discard(channel)
+        subscribers = channel_subscribers.get(channel)
+        if subscribers is not None:
+            subscribers.discard(chat_id)
+            if not subscribers:
+                del channel_subscribers[channel]
+        mark_dirty()
         log(f"User {username} ({chat_id}) removed channel: {channel}")
         await update.message.reply_text(f"🗑 Removed {channel} from your watchlist.")
     else:
@@ -228,7 +566,7 @@ async def remove_channel(update: Update, context: ContextTypes.DEFAULT_TYPE):
 async def list_channels(update: Update, context: ContextTypes.DEFAULT_TYPE):
     chat_id = str(update.effective_chat.id)
     username = update.effective_user.username or update.effective_user.full_name
-    channels = watchlists.get(chat_id, {}).get("channels", [])
+    channels = sorted(watchlists.get(chat_id, {}).get("channels", ()))
     log(f"User {username} ({chat_id}) requested watchlist: {channels}")
 
     if channels:
@@ -253,7 +591,10 @@ async def set_apprise(update: Update, context: ContextTypes.DEFAULT_TYPE):
     # Test the URL
     ap = Apprise()
     ap.add(url)
-    worked = ap.notify(title="Test Notification", body="If you see this, the Apprise URL works!")
+    # notify() blocks on the provider's HTTP call, keep it off the event loop
+    worked = await asyncio.to_thread(
+        ap.notify, title="Test Notification", body="If you see this, the Apprise URL works!"
+    )
 
     if worked:
         await update.message.reply_text(
@@ -274,10 +615,11 @@ async def confirm_apprise(update: Update, context: ContextTypes.DEFAULT_TYPE):
             await update.message.reply_text("⚠️ No pending URL found.")
             return ConversationHandler.END
 
-        watchlists.setdefault(chat_id, {"channels": [], "apprise_urls": []})
+        watchlists.setdefault(chat_id, {"channels": set(), "apprise_urls": []})
         if url not in watchlists[chat_id]["apprise_urls"]:
             watchlists[chat_id]["apprise_urls"].append(url)
-            save_watchlists(watchlists)
+            apprise_cache.pop(chat_id, None)
+            mark_dirty()
             log(f"User {chat_id} saved Apprise URL: {url}")
             await update.message.reply_text("💾 Saved your Apprise URL.")
     else:
@@ -322,18 +664,59 @@ async def remove_apprise(update: Update, context: ContextTypes.DEFAULT_TYPE):
 
     removed_url = apprise_urls.pop(index - 1)
     watchlists[chat_id]["apprise_urls"] = apprise_urls
-    save_watchlists(watchlists)
+    apprise_cache.pop(chat_id, None)
+    mark_dirty()
     log(f"User {chat_id} removed Apprise URL: {removed_url}")
     await update.message.reply_text(f"🗑 Removed Apprise URL:\n{removed_url}")
 
+# === Application lifecycle ===
+async def post_init(application):
+    global SESSION, notification_queue, urgent_check_queue, monitor_wake, _monitor_task
+    SESSION = aiohttp.ClientSession(
+        connector=aiohttp.TCPConnector(
+            limit=16,
+            ttl_dns_cache=300,
+            keepalive_timeout=60
+        ),
+        timeout=HTTP_TIMEOUT
+    )
+    notification_queue = asyncio.Queue()
+    urgent_check_queue = asyncio.Queue()
+    monitor_wake = asyncio.Event()
+    # Run the Twitch monitor and notification workers on the bot's own event loop
+    _monitor_task = asyncio.create_task(monitor_twitch())
+    for _ in range(NOTIFY_WORKERS):
+        _notify_workers.append(asyncio.create_task(notification_worker()))
+
+async def post_shutdown(application):
+    # Stop producing notifications, then give the workers a moment to send what's queued
+    if _monitor_task:
+        _monitor_task.cancel()
+    if notification_queue and _notify_workers:
+        try:
+            await asyncio.wait_for(notification_queue.join(), NOTIFY_DRAIN_TIMEOUT)
+        except asyncio.TimeoutError:
+            log(f"[ERROR] {notification_queue.qsize()} notifications not sent before shutdown.")
+    for task in _notify_workers:
+        task.cancel()
+    if SESSION:
+        await SESSION.close()
+
 # === Main Entry ===
 if __name__ == "__main__":
-    # Start Twitch monitoring in background
-    t = threading.Thread(target=monitor_twitch, daemon=True)
-    t.start()
+    # Coalesce watchlist writes in background, flush whatever is left on exit
+    flusher = threading.Thread(target=watchlist_flusher, daemon=True)
+    flusher.start()
+    atexit.register(stop_watchlist_flusher, flusher)
 
     # Start Telegram bot
-    app = ApplicationBuilder().token(BOT_TOKEN).build()
+    app = (
+        ApplicationBuilder()
+        .token(BOT_TOKEN)
+        .post_init(post_init)
+        .post_shutdown(post_shutdown)
+        .build()
+    )
     app.add_handler(CommandHandler("start", start))
     app.add_handler(CommandHandler("add", add_channel))
     app.add_handler(CommandHandler("remove", remove_channel))